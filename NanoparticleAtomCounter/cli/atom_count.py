@@ -5,8 +5,13 @@ Functions
 ---------
 parse_input_data(input_file: str) -> tuple
     Reads the input CSV or XLXS
+atom_count:
+    run all calculations given input/output paths or file-like objects
+atom_counter_bytes:
+    in-memory wrapper around atom_count for callers
+    (e.g. the streamlit app) that hold the data in buffers
 main:
-    run all calculations
+    command-line entry point
 """
 
 import ast
@@ -30,9 +35,13 @@ OUTPUT = "output_atomcounts.csv"
 
 def parse_input_data(
     input_file: str,
+    file_format: str = None,
 ) -> Tuple[NDArray, NDArray, NDArray, NDArray, NDArray, NDArray]:
     """
     Reads the input csv or xlxs
+    input_file may be a path or an open (binary) file-like object;
+    for file-like objects, give the format via file_format
+    (e.g. ".csv", ".xlsx") since there is no filename to inspect
 
     Expected format of the file:
         FIRST ROW ->        r (A),R (A),Theta,Element,Facet
@@ -56,7 +65,10 @@ def parse_input_data(
         see count_utilities.calculate_constants for the defaults
     """
 
-    ext = path.splitext(input_file)[1].lower()
+    if file_format is not None:
+        ext = "." + file_format.lower().lstrip(".")
+    else:
+        ext = path.splitext(input_file)[1].lower()
     if ext in (".csv",):
         df = pd.read_csv(input_file, delimiter=",")
     elif ext in (".xls", ".xlsx"):
@@ -117,7 +129,12 @@ def parse_input_data(
     return rs, Rs, thetas, elements, interface_facets, surface_facets
 
 
-def main() -> None:
+def atom_count(
+    input_file,
+    output_file=OUTPUT,
+    mode: Literal["volume", "area"] = MODE,
+    file_format: str = None,
+) -> None:
     f"""
     Main function to do all calculations through the selected method
 
@@ -125,52 +142,17 @@ def main() -> None:
         input_file (str):                   input file name, with full path
         output_file (str):                   output file name, with full path. default = 'output.txt'
         mode (Literal["volume", "area"])    whether to calculate by volume or area. Default = 'volume'
+        file_format (str):                  format of input_file (".csv", ".xls", ".xlsx");
+                                            only needed when input_file is a file-like object
 
+    input_file and output_file may also be open file-like objects
+    (e.g. io.BytesIO); see atom_counter_bytes
 
     Returns:
         NONE, but writes out the output file
     """
-    parser = argparse.ArgumentParser(
-        description="""Given an input file containing:
-     (1) NP element type
-     (2) footprint radius or radius of curvature
-     (3) contact angle,
-     (4) (optionally) interface facet
-     (5) (optionally) surface facet
-
-    calculates number of surface, perimeter, interfacial, and total atoms"""
-    )
-
-    parser.add_argument(
-        "--input", "-i", type=str, required=True, help="Path to input file"
-    )
-
-    parser.add_argument(
-        "--output",
-        "-o",
-        type=str,
-        default=OUTPUT,
-        help=f"Path to output file. default = {OUTPUT}",
-    )
-
-    parser.add_argument(
-        "--mode",
-        "-m",
-        type=str,
-        default=MODE,
-        help=f"""Method for calculating: by area ("area") or by volume ("volume").
-            default = 'volume' """,
-        choices=("volume", "area"),
-    )
-
-    start = perf_counter()
-    args = parser.parse_args()
-    input_file = args.input
-    output_file = args.output
-    mode = args.mode.lower()
-
     rs, Rs, thetas, elements, interface_facets, surface_facets = parse_input_data(
-        input_file
+        input_file, file_format=file_format
     )
 
     if np.all(np.isnan(rs)) or np.all(
@@ -238,6 +220,74 @@ def main() -> None:
     )
 
     df.to_csv(output_file, index=False)
+
+
+def atom_counter_bytes(
+    in_buf,
+    out_buf,
+    mode: Literal["volume", "area"] = MODE,
+    file_format: str = ".csv",
+) -> None:
+    """
+    Run the atom counting fully in memory: no temp files, no disk I/O
+
+    Requires:
+        in_buf:     open file-like object (e.g. io.BytesIO) holding the input data
+        out_buf:    open file-like object the output CSV is written into
+        mode (Literal["volume", "area"]):   calculation method. default = 'volume'
+        file_format (str):                  format of in_buf's contents. default = '.csv'
+
+    Returns:
+        NONE, but fills out_buf with the output CSV
+    """
+    atom_count(in_buf, out_buf, mode=mode, file_format=file_format)
+
+
+def main() -> None:
+    """
+    Command-line entry point; parses arguments then runs atom_count
+    """
+    parser = argparse.ArgumentParser(
+        description="""Given an input file containing:
+     (1) NP element type
+     (2) footprint radius or radius of curvature
+     (3) contact angle,
+     (4) (optionally) interface facet
+     (5) (optionally) surface facet
+
+    calculates number of surface, perimeter, interfacial, and total atoms"""
+    )
+
+    parser.add_argument(
+        "--input", "-i", type=str, required=True, help="Path to input file"
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        default=OUTPUT,
+        help=f"Path to output file. default = {OUTPUT}",
+    )
+
+    parser.add_argument(
+        "--mode",
+        "-m",
+        type=str,
+        default=MODE,
+        help=f"""Method for calculating: by area ("area") or by volume ("volume").
+            default = 'volume' """,
+        choices=("volume", "area"),
+    )
+
+    start = perf_counter()
+    args = parser.parse_args()
+    input_file = args.input
+    output_file = args.output
+    mode = args.mode.lower()
+
+    atom_count(input_file, output_file, mode=mode)
+
     print(f"Output ({output_file}) written!")
     timing = perf_counter() - start
     print(f"Calculation took {timing} seconds")
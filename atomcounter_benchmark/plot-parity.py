@@ -6,12 +6,35 @@ The two input files must share the same column headers
 (e.g., Perimeter, Interface, Surface, Total).
 """
 
-from sys import exit
 from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+from os import cpu_count
 from pathlib import Path
 import pandas as pd
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
+##the backend is chosen in main() once --show is known: Agg for the
+##off-screen/parallel path, the interactive default otherwise
+
+
+plt.rcParams.update({"font.size": 15,
+    "font.family": "arial"}
+    )
+
+##above this many points, draw the parity plot as a 2D histogram
+##(hexbin) instead of per-point scatter patches
+DENSE_THRESHOLD = 5_000
+DPI = 150
+
+##zlib level 1 cuts most of the PNG encode CPU for a modest
+##file-size increase; these are benchmark artifacts, not assets
+PNG_KWARGS = {"pil_kwargs": {"compress_level": 1}}
+
+##pyarrow tokenizes CSVs in parallel across cores; fall back to the
+##single-threaded c engine if it isn't installed
+CSV_ENGINE = "pyarrow" if find_spec("pyarrow") is not None else "c"
 
 
 def read_args():
@@ -24,7 +47,8 @@ def read_args():
     parser.add_argument(
         "--show",
         action="store_true",
-        help="show the plots on screen (in addition to saving)",
+        help="show the plots on screen (in addition to saving); "
+        "disables parallel rendering",
     )
     parser.add_argument(
         "--output_dir", type=str, help="directory where parity plots should be saved"
@@ -33,86 +57,287 @@ def read_args():
     return parser.parse_args()
 
 
+def simplify(x, y, width=900, height=900, keep="first"):
+    """
+    Reduce (x, y) to at most one point per output pixel
+
+    Overlapping points are invisible anyway, so rasterize the data to a
+    width x height grid (default 900 = 6 in * 150 dpi) and keep a single
+    representative per cell; scatter cost becomes O(pixels), not O(N)
+
+    keep="last" keeps the point drawn last in each cell, which is what a
+    full scatter would leave on top — use it when color varies
+    (e.g. the heatmap) so outliers stay visible
+
+    Returns the (sorted) indices of the survivors
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    ##NaN/inf coordinates would poison ptp and the int cast below,
+    ##so bin only the finite points and map indices back at the end
+    finite = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(finite) == 0:  # e.g. an entirely empty column
+        return finite
+    x = x[finite]
+    y = y[finite]
+
+    x_span = np.ptp(x) or 1.0  # guard against all-equal columns
+    y_span = np.ptp(y) or 1.0
+    xi = np.clip(((x - x.min()) / x_span * (width - 1)).astype(np.int32), 0, width - 1)
+    yi = np.clip(((y - y.min()) / y_span * (height - 1)).astype(np.int32), 0, height - 1)
+    key = xi * height + yi
+
+    if keep == "last":
+        _, idx = np.unique(key[::-1], return_index=True)
+        idx = len(key) - 1 - idx
+    else:
+        _, idx = np.unique(key, return_index=True)
+
+    return np.sort(finite[idx])
+
+
+##arrays every column's heatmap draws from; installed once per worker
+##process by _init_worker rather than pickled into each task payload
+_SHARED = {}
+
+
+def _init_worker(theta, curv_radii):
+    """
+    Worker initializer: force the off-screen backend and stash
+    the arrays common to all columns
+    """
+    matplotlib.use("Agg", force=True)  # workers only rasterize to file
+    _SHARED["theta"] = theta
+    _SHARED["curv_radii"] = curv_radii
+
+
+##one canvas per figure type per process, reused across columns;
+##allocating a fresh Agg canvas and renderer for every column is a
+##measurable fixed cost
+_FIGURES = {}
+
+
+def _get_axes(kind, figsize, show=False):
+    """
+    Return a cleared (fig, ax) pair for this process,
+    creating the figure on first use
+
+    show mode bypasses the cache: closing a shown window destroys the
+    figure's manager and unregisters it from pyplot, after which it can
+    never be shown again -- so make a fresh figure per column instead
+    (the caller closes it once the window is dismissed)
+    """
+    if show:
+        return plt.subplots(figsize=figsize, dpi=DPI)
+    if kind not in _FIGURES:
+        ##figure dpi matches the savefig dpi so rasterized
+        ##artists are baked at the right resolution
+        _FIGURES[kind] = plt.subplots(figsize=figsize, dpi=DPI)
+    fig, ax = _FIGURES[kind]
+    ax.clear()
+    return fig, ax
+
+
+def _render_col(
+    col,
+    x,
+    y,
+    diff,
+    lo,
+    hi,
+    out_path_1,
+    out_path_2,
+    figsize,
+    vmin,
+    vmax,
+    show=False,
+):
+    """
+    Render the parity plot and difference heatmap for one column;
+    each figure rendering is independent, so this is
+    what gets dispatched to the worker processes
+
+    Returns the two output paths
+    """
+#    ss_res = ((x - y) ** 2).sum()
+#    ss_tot = ((x - x.mean()) ** 2).sum()
+#    r2 = 1 - ss_res / ss_tot if ss_tot != 0 else float("nan")
+#    print(col, r2)
+
+    ##create parity plots
+    fig, ax = _get_axes("parity", figsize, show=show)
+    cbar = None
+    if len(x) > DENSE_THRESHOLD:
+        ##one Agg call for the whole cloud; points per hex are
+        ##precounted so render cost is bounded regardless of N
+        hb = ax.hexbin(x, y, gridsize=80, cmap="Blues", mincnt=1, extent=(lo, hi, lo, hi))
+        cbar = fig.colorbar(hb, ax=ax, label="count")
+    else:
+        visible = simplify(x, y)
+        ##flatten the point collection to an image layer so the PNG
+        ##encoder serializes one raster instead of every patch
+        ax.scatter(x[visible], y[visible], c="tab:blue", rasterized=True)
+    ax.plot([lo, hi], [lo, hi], "k--", lw=1)
+    ax.set_xlabel(f"{col} atoms (atomistic)")
+    ax.set_ylabel(f"{col} atoms (atomcounter)")
+    ax.set_title(f"Parity plot of results: {col}")
+    ax.set_xlim(lo, hi)
+    ax.set_ylim(lo, hi)
+    if col == "Total":
+        ##one dispatch for all labels instead of a Python loop per tick
+        ax.tick_params(axis="x", labelrotation=25)
+        plt.setp(ax.get_xticklabels(), ha="right", rotation_mode="anchor")
+
+    fig.tight_layout()
+    fig.savefig(out_path_1, dpi=DPI, **PNG_KWARGS)
+    if show:
+        plt.show()
+        plt.close(fig)  # not cached; a closed window can't be reshown
+    elif cbar is not None:
+        cbar.remove()  # the next column may not be dense
+
+    ##create heatmap of differences
+    theta = _SHARED["theta"]
+    curv_radii = _SHARED["curv_radii"]
+    visible = simplify(theta, curv_radii, keep="last")
+    fig, ax = _get_axes("heatmap", figsize, show=show)
+    sc = ax.scatter(
+        theta[visible],
+        curv_radii[visible],
+        c=diff[visible],
+        cmap="coolwarm",
+        s=60,
+        vmin=vmin,
+        vmax=vmax,
+        rasterized=True,
+    )
+    cbar = fig.colorbar(sc, ax=ax)
+    cbar.set_label("Absolute Percent Difference (%)")
+    ax.set_ylabel(r"$R$ (Å)")
+    ax.set_xlabel("θ (°)")
+    ax.set_title(f"Heatmap of differences in results: {col}")
+    fig.tight_layout()
+    fig.savefig(out_path_2, dpi=DPI, **PNG_KWARGS)
+    if show:
+        plt.show()
+        plt.close(fig)  # not cached; a closed window can't be reshown
+    else:
+        cbar.remove()  # recreated for the next column
+
+    return out_path_1, out_path_2
+
+
 def main():
     args = read_args()
-    df_a = pd.read_csv(args.csv_a)  # atomistic output
-    df_b = pd.read_csv(args.csv_b)  # atomcounter output
-    df_c = pd.read_csv(args.csv_c)  # input to both
+
+    if not args.show:
+        ##nothing opens a window, so rasterize off-screen
+        matplotlib.use("Agg", force=True)
+
+    ##probe just the headers first (the c engine handles nrows=0), so
+    ##the full reads below can skip parsing every column we never touch
+    header_a = pd.read_csv(args.csv_a, nrows=0).columns
+    header_b = pd.read_csv(args.csv_b, nrows=0).columns
+    header_c = pd.read_csv(args.csv_c, nrows=0).columns
+
+    ##bail on an empty intersection now, before the full files
+    ##are ever parsed
+    common_cols = header_a.str.strip().intersection(header_b.str.strip())
+    if common_cols.empty:
+        raise SystemExit("Error: the two files share no common column headers.")
+
+    ##usecols must name the raw (unstripped) headers, and the pyarrow
+    ##engine only accepts lists, not callables
+    wanted = set(common_cols)
+    df_a = pd.read_csv(
+        args.csv_a,
+        usecols=[c for c in header_a if c.strip() in wanted],
+        dtype=np.float32,
+        engine=CSV_ENGINE,
+    )  # atomistic output
+    df_b = pd.read_csv(
+        args.csv_b,
+        usecols=[c for c in header_b if c.strip() in wanted],
+        dtype=np.float32,
+        engine=CSV_ENGINE,
+    )  # atomcounter output
+    df_c = pd.read_csv(
+        args.csv_c,
+        usecols=[c for c in header_c if c.strip() in ("Theta", "R (A)")],
+        dtype=np.float32,
+        engine=CSV_ENGINE,
+    )  # input to both
 
     df_a.columns = df_a.columns.str.strip()
     df_b.columns = df_b.columns.str.strip()
     df_c.columns = df_c.columns.str.strip()
 
-    common_cols = df_a.columns.intersection(df_b.columns)
-    if common_cols.empty:
-        exit("Error: the two files share no common column headers.")
-
-    out_dir = args.output_dir
+    out_dir = Path(args.output_dir)
     figsize = (6, 6)
-    plt.rcParams.update({"font.size": 15,
-        "font.family": "arial"}
-        )
     vmax, vmin = 100, 0
 
-    for col in common_cols:
-
-        x = df_a[col]
-        y = df_b[col]
-
-#        ss_res = ((x - y) ** 2).sum()
-#        ss_tot = ((x - x.mean()) ** 2).sum()
-#        r2 = 1 - ss_res / ss_tot if ss_tot != 0 else float("nan")
-#        print(col, r2)
-
-        diff = np.abs(100 * (x - y) / y)
-        diff[~np.isfinite(diff)] = np.nan
-
-        theta = df_c["Theta"].values
-        curv_radii = df_c["R (A)"].values
-
-        lo = min(x.min(), y.min())
-        hi = max(x.max(), y.max())
-        pad = 0.05 * (hi - lo)
-        lo, hi = lo - pad, hi + pad
-
-        ##create parity plots
-        plt.figure(figsize=figsize)
-        plt.scatter(x, y, c="tab:blue")
-        plt.plot([lo, hi], [lo, hi], "k--", lw=1)
-        plt.xlabel(f"{col} atoms (atomistic)")
-        plt.ylabel(f"{col} atoms (atomcounter)")
-        plt.title(f"Parity plot of results: {col}")
-        plt.xlim(lo, hi)
-        plt.ylim(lo, hi)
-        if col == "Total":
-            ax = plt.gca()
-            for tick in ax.get_xticklabels():
-                tick.set_rotation(25)
-                tick.set_ha("right")
-
-        plt.tight_layout()
-        out_path_1 = out_dir + f"/parity_{col.lower()}.png"
-        plt.savefig(out_path_1, dpi=150)
-        if args.show:
-            plt.show()
-        print(f"Saved {out_path_1}")
-
-        ##create heatmap of differences
-        plt.close()
-        plt.figure(figsize=figsize)
-        sc = plt.scatter(theta, curv_radii, c=diff, cmap="coolwarm", s=60, vmin=vmin, vmax=vmax)
-        cbar = plt.colorbar(sc)
-        cbar.set_label("Absolute Percent Difference (%)")
-        plt.ylabel(r"$R$ (Å)")
-        plt.xlabel("θ (°)")
-        plt.title(f"Heatmap of differences in results: {col}")
-        plt.tight_layout()
-        out_path_2 = out_dir + f"/heatmap_{col.lower()}.png"
-        plt.savefig(out_path_2, dpi=150)
-        if args.show:
-            plt.show()
-        plt.close()
-        print(f"Saved {out_path_2}")
+    ##precompute all per-column stats in one vectorized pass
+    ##over the aligned matrices, instead of per-column pandas arithmetic;
+    ##everything below here is raw ndarrays, and stays float32 as read
+    A = df_a[common_cols].to_numpy()  # atomistic
+    B = df_b[common_cols].to_numpy()  # atomcounter
+    ##masked divide: zero denominators come out as nan directly,
+    ##with no inf intermediate and no separate isfinite pass
+    num = 100 * np.abs(A - B)
+    diff_pct = np.full_like(num, np.nan)
+    np.divide(num, np.abs(B), out=diff_pct, where=B != 0)
+    ##nanmin/nanmax: a stray NaN cell must not poison the axis limits
+    ##(Series.min()/max() skipped NaN before the vectorization, too)
+    lo_all = np.minimum(np.nanmin(A, axis=0), np.nanmin(B, axis=0))
+    hi_all = np.maximum(np.nanmax(A, axis=0), np.nanmax(B, axis=0))
+    pad_all = 0.05 * (hi_all - lo_all)
+    lo_all, hi_all = lo_all - pad_all, hi_all + pad_all
+
+    theta = df_c["Theta"].to_numpy()
+    curv_radii = df_c["R (A)"].to_numpy()
+
+    render_args = [
+        (
+            col,
+            A[:, i],
+            B[:, i],
+            diff_pct[:, i],
+            lo_all[i],
+            hi_all[i],
+            ##precompute the output names here; workers then only see
+            ##plain serializable strings (and pathlib joins correctly
+            ##on every platform, unlike the old "+" concatenation)
+            str(out_dir / f"parity_{col.lower()}.png"),
+            str(out_dir / f"heatmap_{col.lower()}.png"),
+            figsize,
+            vmin,
+            vmax,
+        )
+        for i, col in enumerate(common_cols)
+    ]
+
+    if args.show:
+        ##plt.show() needs the interactive backend and cannot run in
+        ##a worker, so stash the shared arrays and render serially
+        _SHARED["theta"] = theta
+        _SHARED["curv_radii"] = curv_radii
+        for payload in render_args:
+            for saved in _render_col(*payload, show=True):
+                print(f"Saved {saved}")
+    else:
+        ##each column renders independently, so fan the figures
+        ##out across cores; workers reuse their Agg backend and get
+        ##the shared theta/R arrays once, at startup
+        with ProcessPoolExecutor(
+            max_workers=cpu_count(),
+            initializer=_init_worker,
+            initargs=(theta, curv_radii),
+        ) as executor:
+            futures = [executor.submit(_render_col, *payload) for payload in render_args]
+            for future in futures:
+                for saved in future.result():
+                    print(f"Saved {saved}")
 
 
 if __name__ == "__main__":
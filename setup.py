@@ -47,6 +47,7 @@ setup(
             "ascii-colors",
             "tqdm>=4.66,<5",
             "pytest>=8,<9",
+            "pyarrow>=14", #parallel CSV parsing in plot-parity.py
         ],
 
         "dev": [
@@ -55,6 +56,7 @@ setup(
             "ascii-colors",
             "tqdm>=4.66,<5",
             "pytest>=8,<9",
+            "pyarrow>=14", #parallel CSV parsing in plot-parity.py
         ],
         
     },
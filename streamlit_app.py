@@ -2,23 +2,56 @@
 This is the script the streamlit app uses
 https://nanoparticleatomcounter.streamlit.app/
 """
-import contextlib
-import os
-import tempfile
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import subprocess
-import sys
 import pandas as pd
 import streamlit as st
-from NanoparticleAtomCounter.cli.atom_count import main as atom_counter
+from NanoparticleAtomCounter.cli.atom_count import atom_counter_bytes
 
 
 st.set_page_config(page_title="Nanoparticle Atom Counter", page_icon="🧮")
 
+
+@st.cache_resource
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    One background worker shared across reruns (and sessions),
+    so each button press doesn't spawn a fresh thread pool
+    """
+    return ThreadPoolExecutor(max_workers=1)
+
+
+@st.cache_data
+def _load_file_bytes(file_path: str) -> bytes:
+    """
+    Read a static asset (sample csv, sidebar images) once;
+    Streamlit reruns this script on every widget interaction,
+    so serve the bytes from the memo cache instead of re-reading disk
+    """
+    return Path(file_path).read_bytes()
+
+
+@st.cache_data(show_spinner=False)
+def _run_atom_counter(file_bytes: bytes, mode: str, file_format: str) -> bytes:
+    """
+    Run the atom counting and return the output CSV as bytes;
+    memoized on the upload's content, so re-running the same file
+    (or just toggling widgets) serves the cached result instead of
+    recomputing
+    """
+    out_buf = io.BytesIO()
+    atom_counter_bytes(
+        io.BytesIO(file_bytes), out_buf, mode=mode, file_format=file_format
+    )
+    return out_buf.getvalue()
+
+
 with st.sidebar:
     st.header("Resources")
 
-    SAMPLE_CSV = Path("docs/sample_input.csv").read_bytes()
+    SAMPLE_CSV = _load_file_bytes("docs/sample_input.csv")
     st.download_button(
         "Sample input (.csv)",
         SAMPLE_CSV,
@@ -26,10 +59,14 @@ with st.sidebar:
         mime="text/csv",
     )
 
-    st.image("docs/Acute_1.png", caption="θ < 90°", use_container_width=True)
-    st.image("docs/Obtuse_1.png", caption="θ > 90°", use_container_width=True)
     st.image(
-        "docs/Nanoparticle_Legend.png",
+        _load_file_bytes("docs/Acute_1.png"), caption="θ < 90°", use_container_width=True
+    )
+    st.image(
+        _load_file_bytes("docs/Obtuse_1.png"), caption="θ > 90°", use_container_width=True
+    )
+    st.image(
+        _load_file_bytes("docs/Nanoparticle_Legend.png"),
         caption="Definition of surface, interfacial, and perimeter atoms",
         use_container_width=True,
     )
@@ -63,55 +100,48 @@ if file is None:
     st.stop()  # wait for the user's input
 
 if st.button("⚙️ Run calculation"):
-    with st.spinner("Processing . . . "):
-
-        # temp input file
-        in_suffix = Path(file.name).suffix
-        with tempfile.NamedTemporaryFile(delete=False, suffix=in_suffix) as tempin:
-            tempin.write(file.getbuffer())
-            tempin.flush()
-            in_path = tempin.name
-
-        # temp output file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as tempout:
-            out_path = tempout.name
-
-        try:
-            # run the calculation
-            subprocess.run(
-                [
-                    sys.executable,
-                    "-m",
-                    "NanoparticleAtomCounter.cli.atom_count",
-                    "--input",
-                    in_path,
-                    "--output",
-                    out_path,
-                    "--mode",
-                    mode,
-                ],
-                check=True,
-                capture_output=True,
-                text=True,
-            )
-
-        except subprocess.CalledProcessError as err:
-            st.error(f"Atom-counter failed:\n{err.stderr}")
-            os.remove(in_path)
-            st.stop()
-
-        # now, read and show results
-        df_out = pd.read_csv(out_path)
-
-        st.markdown("#### Results")
-        st.download_button(
-            "Download CSV",
-            data=open(out_path, "rb").read(),
-            file_name="atom_count_output.csv",
-            mime="text/csv",
-        )
-        st.dataframe(df_out, use_container_width=True)
-
-        # cleanup
-        os.remove(in_path)
-        os.remove(out_path)
+    # run the calculation fully in memory: no temp files,
+    # no subprocess, and no disk round-trip for the output
+
+    # hand the work to the background thread and keep the script
+    # responsive, updating the progress bar while we wait;
+    # there's no reliable total to measure against, so creep toward
+    # full and let completion snap it there
+    future = _get_executor().submit(
+        _run_atom_counter,
+        file.getvalue(),
+        mode,
+        Path(file.name).suffix,
+    )
+    progress_bar = st.progress(0, text="Processing . . . ")
+    percent = 0
+    while not future.done():
+        percent = min(99, percent + 5)
+        progress_bar.progress(percent, text="Processing . . . ")
+        time.sleep(0.25)
+
+    try:
+        out_bytes = future.result()
+    except Exception as err:
+        progress_bar.empty()
+        st.error(f"Atom-counter failed:\n{err}")
+        st.stop()
+
+    progress_bar.progress(100, text="Done")
+
+    # now, read and show results; no separate emptiness or
+    # existence probes -- just try the read and handle failure once
+    try:
+        df_out = pd.read_csv(io.BytesIO(out_bytes))
+    except pd.errors.EmptyDataError:
+        st.error("Atom-counter produced no output")
+        st.stop()
+
+    st.markdown("#### Results")
+    st.download_button(
+        "Download CSV",
+        data=out_bytes,
+        file_name="atom_count_output.csv",
+        mime="text/csv",
+    )
+    st.dataframe(df_out, use_container_width=True)